@@ -201,6 +201,7 @@ def main(config: _config.TrainConfig):
         )
 
     jax.config.update("jax_compilation_cache_dir", str(epath.Path("~/.cache/jax").expanduser()))
+    jax.config.update("jax_default_matmul_precision", config.matmul_precision)
 
     rng = jax.random.key(config.seed)
     train_rng, init_rng = jax.random.split(rng)
@@ -131,6 +131,9 @@ class Attention(nn.Module):
     head_dim: int
 
     cache_dtype: str | None = None
+    # None uses the reference einsum attention. "cudnn" (flash attention on
+    # GPU) or "xla" route through the fused jax.nn.dot_product_attention.
+    attn_impl: str | None = None
 
     lora_config: lora.LoRAConfig | None = None
 
@@ -205,6 +208,20 @@ class Attention(nn.Module):
         k, v = k_cache, v_cache
         kv_cache = (idx, k_cache, v_cache)
 
+        if self.attn_impl is not None:
+            # Fused scaled-dot-product attention; avoids materializing the
+            # [B, H, T, S] score matrix. `q` is already scaled and RoPE'd, so
+            # disable the internal scaling.
+            encoded = jax.nn.dot_product_attention(
+                q.astype(dtype),
+                k.astype(dtype),
+                v.astype(dtype),
+                mask=attn_mask,
+                scale=1.0,
+                implementation=self.attn_impl,  # type: ignore[arg-type]
+            )
+            return self.attn_vec_einsum("BTNH,NHD->BTD", encoded), kv_cache
+
         q = einops.rearrange(q, "B T (K G) H -> B T K G H", K=self.num_kv_heads)
         logits = jnp.einsum("BTKGH,BSKH->BKGTS", q, k, preferred_element_type=jnp.float32)
 
@@ -237,6 +254,7 @@ class Block(nn.Module):
     dropout: float = 0.0
     dropout_bdims: tuple[int, ...] = ()
     cache_dtype: str | None = None
+    attn_impl: str | None = None
     lora_configs: ml_collections.ConfigDict = dataclasses.field(default_factory=ml_collections.ConfigDict)
 
     def setup(self):
@@ -247,6 +265,7 @@ class Block(nn.Module):
             features=self.embed_dim,
             head_dim=self.head_dim,
             cache_dtype=self.cache_dtype,
+            attn_impl=self.attn_impl,
             lora_config=self.lora_configs.get("attn"),
         )
         self.pre_ffw_norm = RMSNorm()
@@ -294,6 +313,7 @@ class Module(nn.Module):
     dropout: float = 0.0
     dropout_bdims: tuple[int, ...] = ()  # Every float is dropped independently.
     cache_dtype: str | None = None
+    attn_impl: str | None = None
 
     scan: bool = False
     remat_policy: str = "none"
@@ -312,6 +332,7 @@ class Module(nn.Module):
         kv_cache=None,
         deterministic=True,  # noqa: FBT002
         return_prelogits=False,  # noqa: FBT002
+        decode_len=None,
     ):
         """Embed only, or complete forward pass.
 
@@ -326,6 +347,9 @@ class Module(nn.Module):
           decode: Whether to use kv-cache. Caller must pass masks and positions.
           deterministic: Forwarded to all dropout layers.
           return_prelogits: Whether to return the pre-logits.
+          decode_len: If set, only decode logits for the final `decode_len`
+            positions (the decoding matmul is large because it is a
+            seq_len x vocab_size dense layer).
 
         Returns:
           If `embed_only=False`, then `(logits, out)` will be returned.
@@ -389,6 +413,7 @@ class Module(nn.Module):
             "dropout": self.dropout,
             "dropout_bdims": self.dropout_bdims,
             "cache_dtype": self.cache_dtype,
+            "attn_impl": self.attn_impl,
             "lora_configs": self.lora_configs,
         }
         layers = self.scope.push("layers")
@@ -412,6 +437,8 @@ class Module(nn.Module):
         if return_prelogits:
             return x, kv_cache, out
 
+        if decode_len is not None:
+            x = x[:, -decode_len:]
         x = embedder.decode(x)
         out["logits"] = x
 
@@ -114,13 +114,8 @@ class Pi0(_model.BaseModel):
             image_tokens, _ = self.PaliGemma.img(obs.images[name], train=False)
 
             tokens.append(image_tokens)
-            input_mask.append(
-                einops.repeat(
-                    obs.image_masks[name],
-                    "b -> b s",
-                    s=image_tokens.shape[1],
-                )
-            )
+            # Broadcast view; only materialized by the final concatenate.
+            input_mask.append(jnp.broadcast_to(obs.image_masks[name][:, None], image_tokens.shape[:2]))
             # image tokens attend to each other
             ar_mask += [False] * image_tokens.shape[1]
 
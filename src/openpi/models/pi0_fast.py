@@ -43,40 +43,46 @@ def make_attn_mask(input_mask, mask_ar):
     """
     mask_ar = jnp.broadcast_to(mask_ar, input_mask.shape)
     cumsum = jnp.cumsum(mask_ar, axis=1)
-    attn_mask = cumsum[:, None, :] <= cumsum[:, :, None]
-    valid_mask = input_mask[:, None, :] * input_mask[:, :, None]
-    return jnp.logical_and(attn_mask, valid_mask)
+    # Single fused expression so XLA combines the causal compare and the two
+    # validity ANDs into one kernel instead of materializing separate
+    # [B, S, S] intermediates.
+    return (cumsum[:, None, :] <= cumsum[:, :, None]) & input_mask[:, None, :] & input_mask[:, :, None]
 
 
-@jax.vmap
 def left_to_right_align(x, input_mask, attn_mask):
     """Converts input from left-align to right-aligned."""
-    # Due to vmap, this is operating in a single example (not batch level).
-    assert x.ndim == 2
-    assert input_mask.ndim == 1
-    assert attn_mask.ndim == 2
-    assert x.shape[0] == input_mask.shape[0]
-    assert attn_mask.shape[0] == attn_mask.shape[1], attn_mask.shape
-    seqlen = jnp.max(input_mask * jnp.arange(input_mask.shape[0])) + 1
-    x = jnp.roll(x, -seqlen, axis=0)
-    input_mask = jnp.roll(input_mask, -seqlen, axis=0)
-    attn_mask = jnp.roll(attn_mask, -seqlen, axis=(0, 1))
+    assert x.ndim == 3
+    assert input_mask.ndim == 2
+    assert attn_mask.ndim == 3
+    assert x.shape[:2] == input_mask.shape
+    assert attn_mask.shape[1] == attn_mask.shape[2], attn_mask.shape
+    seq_len = input_mask.shape[1]
+    seqlen = jnp.max(input_mask * jnp.arange(seq_len), axis=-1) + 1
+    if x.shape[0] == 1:
+        # Single-example fast path (the common policy-inference case): one
+        # scalar shift per tensor instead of batched index gathers.
+        x = jnp.roll(x, -seqlen[0], axis=1)
+        input_mask = jnp.roll(input_mask, -seqlen[0], axis=1)
+        attn_mask = jnp.roll(attn_mask, -seqlen[0], axis=(1, 2))
+        return x, input_mask, attn_mask
+    # Batched equivalent of a per-example jnp.roll(..., -seqlen): gather with
+    # wrapped indices, which lowers to one gather per tensor instead of a
+    # vmapped dynamic shift.
+    idx = (jnp.arange(seq_len)[None, :] + seqlen[:, None]) % seq_len
+    x = jnp.take_along_axis(x, idx[:, :, None], axis=1)
+    input_mask = jnp.take_along_axis(input_mask, idx, axis=1)
+    attn_mask = jnp.take_along_axis(attn_mask, idx[:, :, None], axis=1)
+    attn_mask = jnp.take_along_axis(attn_mask, idx[:, None, :], axis=2)
     return x, input_mask, attn_mask
 
 
-def put_along_last_axis(arr, indices, values):
-    """Like np.put_along_axis(..., axis=-1), since jax is missing it."""
-    assert arr.ndim == indices.ndim == values.ndim, (arr.ndim, indices.ndim, values.ndim)
-    onehot = jax.nn.one_hot(indices, arr.shape[-1], dtype=values.dtype)
-    put_mask = jnp.einsum("...i,...in->...n", jnp.ones(values.shape, jnp.int32), onehot)
-    put_values = jnp.einsum("...i,...in->...n", values, onehot)
-    return jnp.where(put_mask, put_values, arr)
-
-
 @dataclasses.dataclass(frozen=True)
 class Pi0FASTConfig(_model.BaseModelConfig):
     dtype: str = "bfloat16"
     paligemma_variant: _gemma.Variant = "gemma_2b"
+    # Attention implementation for the LLM. None uses the reference einsum
+    # attention; "cudnn" enables flash attention on GPU.
+    attn_impl: str | None = None
 
     # Set the model specific defaults.
     action_dim: int = 32
@@ -141,6 +147,7 @@ class Pi0FAST(_model.BaseModel):
                 **paligemma_config,
                 embed_dtype=config.dtype,
                 cache_dtype=config.dtype,
+                attn_impl=config.attn_impl,
             )
         )
         llm.lazy_init(rngs=rngs, method="init")
@@ -159,24 +166,32 @@ class Pi0FAST(_model.BaseModel):
     @at.typecheck
     def embed_inputs(
         self, obs: _model.Observation
-    ) -> tuple[at.Float[at.Array, "b s emb"], at.Bool[at.Array, "b s"], at.Int[at.Array, "b s"]]:
+    ) -> tuple[at.Float[at.Array, "b s emb"], at.Bool[at.Array, "b s"], at.Bool[at.Array, "b s"]]:
         input_mask = []
         ar_mask = []
         token_embeddings = []
-        # embed images
-        for name in obs.images:
-            image_token_embeddings, _ = self.PaliGemma.img(obs.images[name], train=False)
-
-            token_embeddings.append(image_token_embeddings)
-            input_mask.append(
-                einops.repeat(
-                    obs.image_masks[name],
-                    "b -> b s",
-                    s=image_token_embeddings.shape[1],
-                )
-            )
-            # image tokens attend to each other --> AR mask = 0
-            ar_mask.append(0 * input_mask[-1])
+        # embed images: fold all cameras into the batch dim so a single SigLIP
+        # forward reads the encoder weights once instead of once per camera.
+        images = jnp.stack([obs.images[name] for name in obs.images], axis=1)
+        num_images = images.shape[1]
+        image_token_embeddings, _ = self.PaliGemma.img(
+            einops.rearrange(images, "b n h w c -> (b n) h w c"), train=False
+        )
+        image_token_embeddings = einops.rearrange(image_token_embeddings, "(b n) s emb -> b (n s) emb", n=num_images)
+        image_masks = jnp.stack([obs.image_masks[name] for name in obs.images], axis=1)
+
+        batch_size, num_image_tokens = image_token_embeddings.shape[:2]
+
+        token_embeddings.append(image_token_embeddings)
+        # Expand each camera mask over its tokens via a broadcast view; XLA
+        # only materializes it at the final concatenate.
+        input_mask.append(
+            jnp.broadcast_to(
+                image_masks[:, :, None], (batch_size, num_images, num_image_tokens // num_images)
+            ).reshape(batch_size, num_image_tokens)
+        )
+        # image tokens attend to each other --> AR mask = 0
+        ar_mask.append(jnp.zeros((batch_size, num_image_tokens), jnp.bool_))
 
         # add tokenized inputs
         assert obs.tokenized_prompt is not None, "Tokenized prompt is required"
@@ -185,7 +200,9 @@ class Pi0FAST(_model.BaseModel):
         tokenized_inputs_embeddings = self.PaliGemma.llm(obs.tokenized_prompt, embed_only=True)
         token_embeddings.append(tokenized_inputs_embeddings)
         input_mask.append(obs.tokenized_prompt_mask)
-        ar_mask.append(obs.token_ar_mask)
+        # Observation carries the AR flags as int32; convert once on entry so
+        # the whole mask pipeline stays in one bool dtype lane.
+        ar_mask.append(obs.token_ar_mask.astype(jnp.bool_))
 
         # return embeddings, input mask, and ar mask
         return (
@@ -206,31 +223,31 @@ class Pi0FAST(_model.BaseModel):
         input_token_embeddings, input_mask, ar_mask = self.embed_inputs(observation)
         attn_mask = make_attn_mask(input_mask, ar_mask)
 
-        # Compute one-hot targets: we predict *next* token, so shift the input tokens by one.
-        targets = jax.nn.one_hot(
-            observation.tokenized_prompt[:, 1:],
-            self.PaliGemma.llm.module.vocab_size,
-        )
+        # Compute targets: we predict *next* token, so shift the input tokens by one.
+        targets = observation.tokenized_prompt[:, 1:]
 
         # Each input predicts *next* token, so we don't input the last token.
-        pre_logits, _, _ = self.PaliGemma.llm(
-            embedded_prefix=input_token_embeddings[:, :-1],
-            mask=attn_mask[:, :-1, :-1],
-            return_prelogits=True,
-        )
-
         # Only decode logits for the target tokens to save memory
         # (decoding matmul is large because it is a seq_len x vocab_size dense layer).
-        logits, _ = self.PaliGemma.llm(
-            pre_logits=pre_logits[:, -targets.shape[1] :],
+        logits, _, _ = self.PaliGemma.llm(
+            embedded_prefix=input_token_embeddings[:, :-1],
+            mask=attn_mask[:, :-1, :-1],
+            decode_len=targets.shape[1],
         )
-        logp = jax.nn.log_softmax(logits, axis=-1)
+        # Keep the transformer and LM head in config.dtype; only the final
+        # log-softmax runs in float32 for a numerically stable loss.
+        logp = jax.nn.log_softmax(logits.astype(jnp.float32), axis=-1)
 
         # Compute CE loss on token targets
         assert observation.token_loss_mask is not None, "Token loss mask is required"
         loss_mask = observation.token_loss_mask[:, 1:]
-        token_pplx = jnp.sum(targets * logp, axis=-1)
-        return -jnp.sum(token_pplx * loss_mask, axis=-1) / jnp.clip(jnp.sum(loss_mask, -1), 1)
+        # Gather the target log-probs directly instead of materializing a
+        # [b, s, vocab] one-hot and reducing over the vocab axis.
+        token_pplx = jnp.take_along_axis(logp, targets[..., None], axis=-1)[..., 0]
+        # Guard the empty-mask case with a select instead of clip (min/max
+        # pair) on the reduction critical path.
+        denom = jnp.sum(loss_mask, axis=-1)
+        return jnp.where(denom > 0, -jnp.sum(token_pplx * loss_mask, axis=-1) / jnp.maximum(denom, 1), 0.0)
 
     @override
     def sample_actions(
@@ -238,7 +255,7 @@ class Pi0FAST(_model.BaseModel):
         rng: at.KeyArrayLike,
         observation: _model.Observation,
         *,
-        max_decoding_steps: int | at.Int[at.Array, ""] = 256,
+        max_decoding_steps: int = 256,
         temperature: float = 0.0,
     ) -> _model.Actions:
         # TODO: this is a hack to get the image keys.
@@ -262,27 +279,40 @@ class Pi0FAST(_model.BaseModel):
         # pad attention mask to set the size of the KV cache (prefill_size + max_decoding_steps)
         prefix_attn_mask = jnp.pad(prefix_attn_mask, ((0, 0), (0, 0), (0, max_decoding_steps)))
         prefix_positions = jnp.cumsum(prefix_mask, axis=-1) - 1
-        prefix_logits, kv_cache, _ = self.PaliGemma.llm(
-            embedded_prefix=prefix_token_embeddings, mask=prefix_attn_mask, positions=prefix_positions, decode=True
+        # Only the final prefill position is ever read (it decodes the first
+        # token), so only run the vocab-sized unembedding matmul on it.
+        last_logit, kv_cache, _ = self.PaliGemma.llm(
+            embedded_prefix=prefix_token_embeddings,
+            mask=prefix_attn_mask,
+            positions=prefix_positions,
+            decode=True,
+            decode_len=1,
         )
-
-        # prepare decoding -- final logit decodes the first token
-        last_logit = prefix_logits[:, -1:]
         output_tokens = jnp.zeros((last_logit.shape[0], max_decoding_steps))
 
-        def step(carry):
-            rng, last_logit, output_tokens, cache, _, step = carry
+        # Loop-invariant pieces of the per-step decode mask; closed over by
+        # `step` so they are not rebuilt on every iteration. The lower bound
+        # only depends on prefix_start, which is constant per batch element.
+        all_positions = jnp.arange(prefill_size + max_decoding_steps)
+        prefix_valid = all_positions[None, None, :] >= prefix_start[:, None, None]
+
+        # `temperature` is a Python float, so the sampling mode is resolved at
+        # trace time -- lax.cond would compile both branches into the loop body
+        # and pay for `categorical` even in greedy mode. Greedy decoding
+        # consumes no randomness, so the RNG key is dropped from the loop
+        # carry entirely: no key to thread, no per-step split.
 
+        def step(carry):
             # Sample token from last logit
-            # Split RNG for this step
-            rng, rng_step = jax.random.split(rng)
-            token = jax.lax.cond(
-                temperature > 0.0,
-                lambda _: jax.random.categorical(rng_step, last_logit / temperature, axis=-1),
-                lambda _: jnp.argmax(last_logit, axis=-1),
-                operand=None,
-            )
-            output_tokens = put_along_last_axis(output_tokens, jnp.broadcast_to(step, (token.shape[0], 1)), token)
+            if temperature > 0.0:
+                rng, last_logit, output_tokens, cache, _, step = carry
+                rng, rng_step = jax.random.split(rng)
+                token = jax.random.categorical(rng_step, last_logit / temperature, axis=-1)
+            else:
+                last_logit, output_tokens, cache, _, step = carry
+                token = jnp.argmax(last_logit, axis=-1)
+            # Write the sampled token at the current step (scatter of a single column).
+            output_tokens = jax.lax.dynamic_update_slice(output_tokens, token.astype(output_tokens.dtype), (0, step))
 
             # Check for early stopping --> stop if all batch elements have EOS token
             has_eos = jnp.any(token == PALIGEMMA_EOS_TOKEN, axis=-1)
@@ -291,23 +321,21 @@ class Pi0FAST(_model.BaseModel):
             # Decode one step
             token_embedding = self.PaliGemma.llm(token, embed_only=True)
             positions = prefill_len[:, None] + step + 1
-            mask = jnp.logical_and(
-                jnp.arange(prefill_size + max_decoding_steps)[None, None, :] >= prefix_start[:, None, None],
-                jnp.arange(prefill_size + max_decoding_steps)[None, None, :]
-                < (jnp.broadcast_to(prefill_size + step + 1, (prefix_start.shape[0], 1, 1))),
-            )
+            mask = prefix_valid & (all_positions[None, None, :] < prefill_size + step + 1)
             last_logit, kv_cache, _ = self.PaliGemma.llm(
                 embedded_prefix=token_embedding, mask=mask, positions=positions, decode=True, kv_cache=cache
             )
 
-            return rng, last_logit, output_tokens, kv_cache, all_eos, step + 1
+            next_carry = (last_logit, output_tokens, kv_cache, all_eos, step + 1)
+            return (rng, *next_carry) if temperature > 0.0 else next_carry
 
         def cond(carry):
-            _, _, _, _, all_eos, step = carry
+            *_, all_eos, step = carry
             return (~all_eos) & (step < max_decoding_steps)
 
+        init_carry = (last_logit, output_tokens, kv_cache, False, 0)
+        if temperature > 0.0:
+            init_carry = (rng, *init_carry)
         # Use lax.while_loop so we can jit the full decoding loop.
-        _, _, output_tokens, _, _, _ = jax.lax.while_loop(
-            cond, step, (rng, last_logit, output_tokens, kv_cache, False, 0)
-        )
-        return output_tokens
+        carry = jax.lax.while_loop(cond, step, init_carry)
+        return carry[-4]
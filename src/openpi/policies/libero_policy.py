@@ -1,6 +1,5 @@
 import dataclasses
 
-import einops
 import numpy as np
 
 from openpi import transforms
@@ -22,7 +21,9 @@ def _parse_image(image) -> np.ndarray:
     if np.issubdtype(image.dtype, np.floating):
         image = (255 * image).astype(np.uint8)
     if image.shape[0] == 3:
-        image = einops.rearrange(image, "c h w -> h w c")
+        # Plain transpose + one memcpy; this runs per image per sample on the
+        # data-loader thread, so skip einops' pattern-parsing overhead.
+        image = np.ascontiguousarray(image.transpose(1, 2, 0))
     return image
 
 
@@ -60,8 +60,13 @@ class Policy(BasePolicy):
             self._model.eval()
             self._sample_actions = model.sample_actions
         else:
-            # JAX model setup
-            self._sample_actions = nnx_utils.module_jit(model.sample_actions)
+            # JAX model setup. Decoding shapes and the sampling mode are
+            # compile-time constants (see Pi0FAST.sample_actions), so treat the
+            # corresponding kwargs as static; one executable is reused across
+            # calls instead of re-tracing when they are passed.
+            self._sample_actions = nnx_utils.module_jit(
+                model.sample_actions, static_argnames=("max_decoding_steps", "temperature")
+            )
             self._rng = rng or jax.random.key(0)
 
     @override
@@ -485,6 +485,11 @@ class TrainConfig:
     # Precision for PyTorch training.
     pytorch_training_precision: Literal["bfloat16", "float32"] = "bfloat16"
 
+    # Default matmul precision for JAX training. "tensorfloat32" uses TF32
+    # tensor cores on Ampere+ GPUs for matmuls on residual float32 paths
+    # (~2x throughput at near-fp32 accuracy); "highest" keeps full fp32.
+    matmul_precision: Literal["default", "tensorfloat32", "highest"] = "tensorfloat32"
+
     lr_schedule: _optimizer.LRScheduleConfig = dataclasses.field(default_factory=_optimizer.CosineDecaySchedule)
     optimizer: _optimizer.OptimizerConfig = dataclasses.field(default_factory=_optimizer.AdamW)
     ema_decay: float | None = 0.99
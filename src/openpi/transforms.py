@@ -105,9 +105,14 @@ class RepackTransform(DataTransformFn):
 class InjectDefaultPrompt(DataTransformFn):
     prompt: str | None
 
+    def __post_init__(self):
+        # Cache the array form once; this transform runs per sample in the
+        # data-loader hot loop and the prompt is read-only downstream.
+        object.__setattr__(self, "_prompt", None if self.prompt is None else np.asarray(self.prompt))
+
     def __call__(self, data: DataDict) -> DataDict:
-        if self.prompt is not None and "prompt" not in data:
-            data["prompt"] = np.asarray(self.prompt)
+        if self._prompt is not None and "prompt" not in data:
+            data["prompt"] = self._prompt
         return data
 
 
@@ -209,14 +214,17 @@ class DeltaActions(DataTransformFn):
     # See `make_bool_mask` for more details.
     mask: Sequence[bool] | None
 
+    def __post_init__(self):
+        # Cache the array form; this transform runs once per sample.
+        object.__setattr__(self, "_mask", None if self.mask is None else np.asarray(self.mask))
+
     def __call__(self, data: DataDict) -> DataDict:
-        if "actions" not in data or self.mask is None:
+        if "actions" not in data or self._mask is None:
             return data
 
         state, actions = data["state"], data["actions"]
-        mask = np.asarray(self.mask)
-        dims = mask.shape[-1]
-        actions[..., :dims] -= np.expand_dims(np.where(mask, state[..., :dims], 0), axis=-2)
+        dims = self._mask.shape[-1]
+        actions[..., :dims] -= np.expand_dims(np.where(self._mask, state[..., :dims], 0), axis=-2)
         data["actions"] = actions
 
         return data
@@ -231,14 +239,17 @@ class AbsoluteActions(DataTransformFn):
     # See `make_bool_mask` for more details.
     mask: Sequence[bool] | None
 
+    def __post_init__(self):
+        # Cache the array form; this transform runs once per sample.
+        object.__setattr__(self, "_mask", None if self.mask is None else np.asarray(self.mask))
+
     def __call__(self, data: DataDict) -> DataDict:
-        if "actions" not in data or self.mask is None:
+        if "actions" not in data or self._mask is None:
             return data
 
         state, actions = data["state"], data["actions"]
-        mask = np.asarray(self.mask)
-        dims = mask.shape[-1]
-        actions[..., :dims] += np.expand_dims(np.where(mask, state[..., :dims], 0), axis=-2)
+        dims = self._mask.shape[-1]
+        actions[..., :dims] += np.expand_dims(np.where(self._mask, state[..., :dims], 0), axis=-2)
         data["actions"] = actions
 
         return data